@@ -3,7 +3,7 @@ Smart Job Recommender - Streamlit Cloud Deployment Version
 =============================================
 
 Updated version using Google Custom Search JSON API with GOOGLE_API_KEY and SEARCH_ENGINE_ID.
-Compatible with streamlit>=1.48.0, requests>=2.32.0, google-generativeai==0.8.0, pypdf==5.9.0.
+Compatible with streamlit>=1.49.0, requests>=2.32.0, google-generativeai==0.8.0, pypdf==5.9.0.
 
 Main changes (v2.6):
 - Added background image via CSS.
@@ -19,26 +19,23 @@ Version: 2.6 (Custom Search API with Background Image)
 
 import streamlit as st
 import requests
-import time
+import functools
+import hashlib
+import heapq
+import io
+import json
 import os
+import re
+import textwrap
+import threading
 from typing import List, Dict, Any
-import tempfile
-from urllib.parse import quote_plus
-
-# Import AI libraries with error handling
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    st.error("Google Generative AI not available. Please install: pip install google-generativeai==0.8.0")
-
-try:
-    from pypdf import PdfReader
-    PYPDF_AVAILABLE = True
-except ImportError:
-    PYPDF_AVAILABLE = False
-    st.error("PyPDF not available. Please install: pip install pypdf==5.9.0")
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit, urlunsplit
+
+# AI, PDF and JSON libraries are imported on first use (see the _load_* helpers),
+# so a session only pays for the ones it actually needs
 
 # ============================================================================
 # CONFIGURATION
@@ -51,6 +48,195 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Skills recognised in job descriptions (lowercase)
+TECH_SKILLS = (
+    "python", "java", "javascript", "typescript", "c++", "c#", "php", "ruby", "go", "rust", "swift", "kotlin",
+    "react", "angular", "vue.js", "node.js", "express", "django", "flask", "fastapi", "spring boot",
+    "html", "css", "sass", "bootstrap", "tailwind", "jquery",
+    "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch", "oracle", "sqlite",
+    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "git", "github", "gitlab",
+    "terraform", "ansible", "linux", "bash",
+    "machine learning", "ai", "data analysis", "pandas", "numpy", "tensorflow", "pytorch",
+    "tableau", "power bi", "excel", "r", "spark",
+    "communication", "leadership", "project management", "agile", "scrum", "problem solving",
+    "teamwork", "time management"
+)
+
+# Single-word skills are matched against a description's token set; only the
+# multi-word ones need a text scan, done as one alternation (longest first)
+_SINGLE_WORD_SKILLS = frozenset(skill for skill in TECH_SKILLS if " " not in skill)
+_MULTI_WORD_SKILLS_RX = re.compile(
+    "|".join(map(re.escape, sorted((s for s in TECH_SKILLS if " " in s), key=len, reverse=True)))
+)
+
+_TOKEN_RX = re.compile(r"[a-z0-9#+.]+")
+
+CUSTOM_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+# Appended to every Custom Search query to keep results on job boards
+JOB_SITES_FILTER = " site:*.linkedin.com | site:*.indeed.com | site:*.glassdoor.com | site:*.monster.com | site:*.careerbuilder.com"
+
+# Locations that get an extra internship query in location-based search
+INDIA_LOCATIONS = ("india", "mumbai", "delhi", "bangalore", "chennai", "pune", "hyderabad")
+_INDIA_LOCATION_RX = re.compile("|".join(map(re.escape, INDIA_LOCATIONS)), re.IGNORECASE)
+
+# Query parameters job boards add for click tracking; they don't identify the posting
+_TRACKING_PARAMS = frozenset({"trk", "trackingid", "refid", "position", "pagenum", "originalsubdomain"})
+
+# Titles that put a result in the internships list
+_INTERNSHIP_TITLE_RX = re.compile(r"\b(?:intern(?:ship)?s?|trainees?)\b", re.IGNORECASE)
+
+# Model used for resume analysis
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Structured output for resume analysis, so Gemini returns JSON instead of prose
+RESUME_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "skills": {"type": "array", "items": {"type": "string"}},
+        "job_interests": {"type": "array", "items": {"type": "string"}},
+        "experience_level": {"type": "string", "enum": ["entry", "mid", "senior"]}
+    }
+}
+
+
+def _tokenize(text_lower: str) -> set:
+    """Split lowercased text into word tokens, keeping dotted names like node.js whole"""
+    tokens = set()
+    for token in _TOKEN_RX.findall(text_lower):
+        token = token.strip(".")
+        if token:
+            tokens.add(token)
+            if "." in token:
+                tokens.update(token.split("."))
+    return tokens
+
+
+def _normalize_link(link: str) -> str:
+    """Canonical form of an apply link for de-duplication: lowercase host, no fragment or tracking params"""
+    try:
+        parts = urlsplit(link.strip())
+        query = urlencode([
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+        ])
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+    except ValueError:
+        # Malformed links (e.g. an unclosed IPv6 bracket) still de-duplicate on their raw text
+        return link.strip().lower()
+
+
+def _google_search_url(company: str, title: str, suffix: str) -> str:
+    """Google search URL used when a listing has no direct apply link"""
+    return f"https://www.google.com/search?q={quote_plus(f'{company} {title} {suffix}')}"
+
+
+def _read_secret(name: str):
+    """Read a setting from Streamlit secrets, falling back to the environment"""
+    try:
+        return st.secrets.get(name) or os.environ.get(name)
+    except Exception:
+        return os.environ.get(name)
+
+
+_API_KEY_NAMES = ("GEMINI_API_KEY", "GOOGLE_API_KEY", "SEARCH_ENGINE_ID")
+
+
+@st.cache_resource(show_spinner=False)
+def _resolve_api_keys() -> Dict[str, Any]:
+    """Read every API credential once per process; raises KeyError (so nothing is cached) while any is missing"""
+    api_keys = {name: _read_secret(name) for name in _API_KEY_NAMES}
+    missing = [name for name, value in api_keys.items() if not value]
+    if missing:
+        raise KeyError(", ".join(missing))
+    return api_keys
+
+
+def _get_api_keys() -> Dict[str, Any]:
+    """API credentials: cached once all are configured, re-read each run until then so newly added keys are seen"""
+    try:
+        return _resolve_api_keys()
+    except KeyError:
+        return {name: _read_secret(name) for name in _API_KEY_NAMES}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_genai():
+    """Import google.generativeai on first use; None if it isn't installed"""
+    try:
+        import google.generativeai as genai
+        return genai
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_orjson():
+    """Import orjson on first use; None if it isn't installed (stdlib json is used instead)"""
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _get_pdfium_lock() -> threading.Lock:
+    """Process-wide lock serialising PDFium calls (a script global would be rebuilt on every rerun)"""
+    return threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pdfium():
+    """Import pypdfium2 on first use; None if it isn't installed"""
+    try:
+        import pypdfium2 as pdfium
+        return pdfium
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pdf_reader():
+    """Import pypdf's PdfReader on first use; None if it isn't installed"""
+    try:
+        from pypdf import PdfReader
+        return PdfReader
+    except ImportError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _get_gemini_model(api_key: str):
+    """Configure Gemini once per API key and share the model across reruns and sessions"""
+    genai = _load_genai()
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        GEMINI_MODEL,
+        generation_config={
+            "response_mime_type": "application/json",
+            "response_schema": RESUME_ANALYSIS_SCHEMA
+        }
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_custom_search_json(_session: requests.Session, key_hash: str, search_engine_id: str, query: str, _google_api_key: str) -> Dict[str, Any]:
+    """Run one Custom Search query, cached for an hour on (API key hash, engine, query)"""
+    params = {
+        "key": _google_api_key,
+        "cx": search_engine_id,
+        "q": query + JOB_SITES_FILTER,
+        "num": 10,  # Max results per query
+        "safe": "off"  # Disable SafeSearch for broader results
+    }
+    response = _session.get(CUSTOM_SEARCH_URL, params=params, timeout=15)
+    if response.status_code != 200:
+        # Raising keeps API errors out of the cache
+        raise requests.HTTPError(response.text, response=response)
+    orjson = _load_orjson()
+    return orjson.loads(response.content) if orjson else response.json()
+
 # ============================================================================
 # CORE RAG SYSTEM CLASS
 # ============================================================================
@@ -59,93 +245,91 @@ class SmartJobRecommenderRAG:
     """Enhanced RAG system for job recommendations using Gemini Flash"""
 
     def __init__(self):
-        self.gemini_client = None
-        self.initialize_gemini()
+        self.gemini_client = None  # created on first analysis by initialize_gemini
+        self.http_session = requests.Session()  # keeps Custom Search connections alive between queries
+        # One pooled connection per concurrent query, with backoff on rate limits and transient 5xx
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET"}), raise_on_status=False)
+        self.http_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=retry))
 
     def initialize_gemini(self) -> bool:
         """Initialize Gemini AI client"""
         try:
-            try:
-                gemini_key = st.secrets.get("GEMINI_API_KEY") or os.environ.get("GEMINI_API_KEY")
-            except Exception:
-                gemini_key = os.environ.get("GEMINI_API_KEY")
+            gemini_key = _get_api_keys()["GEMINI_API_KEY"]
 
-            if gemini_key and GEMINI_AVAILABLE:
-                try:
-                    genai.configure(api_key=gemini_key)
-                    self.gemini_client = genai.GenerativeModel('gemini-1.5-flash')
-                    st.success("AI system initialized successfully")
-                    return True
-                except Exception as e:
-                    st.error(f"❌ Error initializing Gemini client: {e}")
-                    return False
-            else:
+            if not gemini_key:
                 st.error("❌ Gemini API key required. Please add GEMINI_API_KEY to your Streamlit secrets.")
                 return False
+
+            if _load_genai() is None:
+                st.error("Google Generative AI not available. Please install: pip install google-generativeai==0.8.0")
+                return False
+
+            try:
+                self.gemini_client = _get_gemini_model(gemini_key)
+                return True
+            except Exception as e:
+                st.error(f"❌ Error initializing Gemini client: {e}")
+                return False
         except Exception as e:
             st.error(f"❌ Error initializing Gemini: {e}")
             return False
 
-    def load_document_with_pypdf(self, uploaded_file) -> List:
-        """Load PDF document using PyPDF (defensive against None pages)"""
-        if not PYPDF_AVAILABLE:
-            st.error("PyPDF not available for document processing")
-            return []
+    def load_document_with_pypdf(self, uploaded_file) -> str:
+        """Load PDF text with PDFium when available, else PyPDF (defensive against None pages)"""
+        pdfium = _load_pdfium()
+        PdfReader = _load_pdf_reader() if pdfium is None else None
+        if pdfium is None and PdfReader is None:
+            st.error("No PDF library available. Please install: pip install pypdfium2 (or pypdf==5.9.0)")
+            return ""
 
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(uploaded_file.getbuffer())
-                temp_file_path = temp_file.name
-
-            documents = []
-            reader = PdfReader(temp_file_path)
-
-            for page_num, page in enumerate(reader.pages):
-                text = page.extract_text_lines() if hasattr(page, 'extract_text_lines') else page.extract_text() if hasattr(page, 'extract_text') else None
-                if text and text.strip():
-                    doc_obj = type('Document', (), {
-                        'page_content': text,
-                        'metadata': {'page': page_num + 1}
-                    })()
-                    documents.append(doc_obj)
-
-            try:
-                os.unlink(temp_file_path)
-            except Exception:
-                pass
+            pages = []
+
+            if pdfium is not None:
+                # PDFium's native text extraction is several times faster than pypdf's.
+                # PDFium is not thread-safe and sessions run on separate threads.
+                with _get_pdfium_lock():
+                    pdf = pdfium.PdfDocument(uploaded_file)
+                    try:
+                        for page in pdf:
+                            textpage = page.get_textpage()
+                            text = textpage.get_text_range()
+                            textpage.close()
+                            page.close()
+                            if text and text.strip():
+                                pages.append(text)
+                    finally:
+                        pdf.close()
+            else:
+                reader = PdfReader(uploaded_file)
+                for page in reader.pages:
+                    text = page.extract_text_lines() if hasattr(page, 'extract_text_lines') else page.extract_text() if hasattr(page, 'extract_text') else None
+                    if text and text.strip():
+                        pages.append(text)
 
-            st.success(f"✅ Loaded {len(documents)} pages from PDF")
-            return documents
+            st.success(f"✅ Loaded {len(pages)} pages from PDF")
+            return "\n\n".join(pages)
 
         except Exception as e:
             st.error(f"❌ Error loading PDF: {e}")
-            return []
+            return ""
 
 
 
     def call_direct_gemini(self, prompt: str) -> Dict[str, Any]:
         """Call Gemini directly for text analysis"""
-        if not self.gemini_client:
+        if not self.gemini_client and not self.initialize_gemini():
             return {"skills": [], "job_interests": [], "experience_level": "entry"}
 
         try:
             response = self.gemini_client.generate_content(prompt)
-            response_text = response.text
-
-            skills = []
-            job_interests = []
-            experience_level = "entry"
-
-            lines = response_text.split('\n')
-            for line in lines:
-                if line.startswith('SKILLS:'):
-                    skills_text = line.replace('SKILLS:', '').strip()
-                    skills = [s.strip() for s in skills_text.split(',') if s.strip()]
-                elif line.startswith('JOB_INTERESTS:'):
-                    interests_text = line.replace('JOB_INTERESTS:', '').strip()
-                    job_interests = [i.strip() for i in interests_text.split(',') if i.strip()]  # Fixed 's' to 'i'
-                elif line.startswith('EXPERIENCE_LEVEL:'):
-                    experience_level = line.replace('EXPERIENCE_LEVEL:', '').strip().lower()
+            orjson = _load_orjson()
+            data = (orjson.loads if orjson else json.loads)(response.text)  # shaped by RESUME_ANALYSIS_SCHEMA
+
+            skills = [s.strip() for s in data.get("skills") or [] if s and s.strip()]
+            job_interests = [i.strip() for i in data.get("job_interests") or [] if i and i.strip()]
+            experience_level = (data.get("experience_level") or "entry").strip().lower()
 
             return {
                 "skills": skills[:10],
@@ -201,16 +385,13 @@ class SmartJobRecommenderRAG:
     def search_jobs_with_custom_search_api(self, skills: List[str], job_interests: List[str]) -> Dict[str, List]:
         """Search jobs using Google Custom Search JSON API"""
         try:
-            try:
-                google_api_key = st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-                search_engine_id = st.secrets.get("SEARCH_ENGINE_ID") or os.environ.get("SEARCH_ENGINE_ID")
-            except Exception:
-                google_api_key = os.environ.get("GOOGLE_API_KEY")
-                search_engine_id = os.environ.get("SEARCH_ENGINE_ID")
+            api_keys = _get_api_keys()
+            google_api_key = api_keys["GOOGLE_API_KEY"]
+            search_engine_id = api_keys["SEARCH_ENGINE_ID"]
 
             if not google_api_key or not search_engine_id:
                 st.error("❌ Google API key and Search Engine ID required. Please add GOOGLE_API_KEY and SEARCH_ENGINE_ID to your Streamlit secrets.")
-                return {"jobs": [], "internships": [], "search_queries": []}
+                return {"jobs": [], "internships": [], "search_queries": [], "search_failed": True}
 
             search_queries = []
             if skills:
@@ -234,95 +415,38 @@ class SmartJobRecommenderRAG:
             if not search_queries:
                 search_queries = ["software developer jobs", "python developer jobs", "data scientist jobs"]
 
-            st.write(f"🔍 Generated search queries: {search_queries}")  # Debug
-
-            all_jobs = []
-            all_internships = []
-
-            url = "https://www.googleapis.com/customsearch/v1"
-
-            for query in search_queries[:5]:  # Increased to 5 queries
-                try:
-                    params = {
-                        "key": google_api_key,
-                        "cx": search_engine_id,
-                        "q": query + " site:*.linkedin.com | site:*.indeed.com | site:*.glassdoor.com | site:*.monster.com | site:*.careerbuilder.com",
-                        "num": 10,  # Max results per query
-                        "safe": "off"  # Disable SafeSearch for broader results
-                    }
+            # Skills and interests often overlap; don't pay for the same query twice
+            search_queries = list(dict.fromkeys(q.lower().strip() for q in search_queries))
 
-                    st.info(f"🔍 Searching Google Custom Search for '{query}'...")
-
-                    response = requests.get(url, params=params, timeout=15)
-                    st.write(f"API Response Status: {response.status_code}")  # Debug
-                    if response.status_code != 200:
-                        st.warning(f"API Error: {response.text}")
-                        continue
-
-                    data = response.json()
-                    st.write(f"API Response Items: {len(data.get('items', []))}")  # Debug
-
-                    items_key = "items"
-                    if items_key not in data or not data[items_key]:
-                        st.warning(f"No results found for query: {query}")
-                        continue
-
-                    for item in data[items_key]:
-                        job_data = {
-                            "title": item.get("title", "Unknown Title") or "Unknown Title",
-                            "company": item.get("pagemap", {}).get("metatags", [{}])[0].get("og:site_name", "Unknown Company") or "Unknown Company",
-                            "location": item.get("pagemap", {}).get("metatags", [{}])[0].get("og:locality", "Unknown Location") or "Unknown Location",
-                            "description": item.get("snippet", "No description") or "No description",
-                            "apply_link": self.get_best_apply_link(item, response_data=data),
-                            "salary": "Not specified",
-                            "source": "Google Custom Search",
-                            "match_score": self.calculate_match_score(skills, item.get("snippet", "")),
-                            "required_skills": self.extract_skills_from_description(item.get("snippet", ""))
-                        }
-
-                        title_lower = (job_data["title"] or "").lower()
-                        if any(word in title_lower for word in ["intern", "internship", "trainee"]):
-                            all_internships.append(job_data)
-                        else:
-                            all_jobs.append(job_data)
-
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    st.warning(f"⚠️ Error searching Google Custom Search: {str(e)}")
-                    continue
+            st.write(f"🔍 Generated search queries: {search_queries}")  # Debug
 
-            unique_jobs = self.remove_duplicates(all_jobs)
-            unique_internships = self.remove_duplicates(all_internships)
+            raw_items, failed_queries = self.collect_search_items(search_queries[:5], google_api_key, search_engine_id)
 
-            unique_jobs.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-            unique_internships.sort(key=lambda x: x.get("match_score", 0), reverse=True)
+            ranked = self.rank_search_items(raw_items, skills)
 
-            st.success(f"✅ Found {len(unique_jobs)} jobs and {len(unique_internships)} internships")
+            st.success(f"✅ Found {ranked['job_count']} jobs and {ranked['internship_count']} internships")
 
             return {
-                "jobs": unique_jobs[:20],  # Increased limit
-                "internships": unique_internships[:10],  # Increased limit
-                "search_queries": search_queries[:8]
+                "jobs": ranked["jobs"],
+                "internships": ranked["internships"],
+                "search_queries": search_queries[:8],
+                "search_failed": failed_queries > 0  # partial results are shown but not cached
             }
 
         except Exception as e:
             st.error(f"❌ Error with job search: {e}")
-            return {"jobs": [], "internships": [], "search_queries": []}
+            return {"jobs": [], "internships": [], "search_queries": [], "search_failed": True}
 
     def search_jobs_with_custom_search_api_location(self, skills: List[str], job_interests: List[str], location: str) -> Dict[str, List]:
         """Search jobs with location preference using Google Custom Search JSON API"""
         try:
-            try:
-                google_api_key = st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-                search_engine_id = st.secrets.get("SEARCH_ENGINE_ID") or os.environ.get("SEARCH_ENGINE_ID")
-            except Exception:
-                google_api_key = os.environ.get("GOOGLE_API_KEY")
-                search_engine_id = os.environ.get("SEARCH_ENGINE_ID")
+            api_keys = _get_api_keys()
+            google_api_key = api_keys["GOOGLE_API_KEY"]
+            search_engine_id = api_keys["SEARCH_ENGINE_ID"]
 
             if not google_api_key or not search_engine_id:
                 st.error("❌ Google API key and Search Engine ID required. Please add GOOGLE_API_KEY and SEARCH_ENGINE_ID to your Streamlit secrets.")
-                return {"jobs": [], "internships": [], "search_queries": []}
+                return {"jobs": [], "internships": [], "search_queries": [], "search_failed": True}
 
             search_queries = []
             if skills:
@@ -342,192 +466,309 @@ class SmartJobRecommenderRAG:
                         f"{interest} jobs {location}"
                     ])
 
-            if any(word in location.lower() for word in ["india", "mumbai", "delhi", "bangalore", "chennai", "pune", "hyderabad"]):
+            if _INDIA_LOCATION_RX.search(location):
                 search_queries.append(f"internship {location}")
 
             if not search_queries:
                 search_queries = [f"software developer jobs {location}", f"python developer jobs {location}"]
 
+            # Skills and interests often overlap; don't pay for the same query twice
+            search_queries = list(dict.fromkeys(q.lower().strip() for q in search_queries))
+
             st.write(f"🔍 Generated location-based search queries: {search_queries}")  # Debug
 
-            all_jobs = []
-            all_internships = []
+            raw_items, failed_queries = self.collect_search_items(search_queries[:5], google_api_key, search_engine_id, location=location)
 
-            url = "https://www.googleapis.com/customsearch/v1"
+            ranked = self.rank_search_items(raw_items, skills, location=location)
 
-            for query in search_queries[:5]:
-                try:
-                    params = {
-                        "key": google_api_key,
-                        "cx": search_engine_id,
-                        "q": query + " site:*.linkedin.com | site:*.indeed.com | site:*.glassdoor.com | site:*.monster.com | site:*.careerbuilder.com",
-                        "num": 10,
-                        "safe": "off"
-                    }
+            st.success(f"✅ Found {ranked['job_count']} jobs and {ranked['internship_count']} internships in {location}")
+
+            return {
+                "jobs": ranked["jobs"],
+                "internships": ranked["internships"],
+                "search_queries": search_queries[:8],
+                "search_failed": failed_queries > 0  # partial results are shown but not cached
+            }
 
+        except Exception as e:
+            st.error(f"❌ Error with location-based job search: {e}")
+            return {"jobs": [], "internships": [], "search_queries": [], "search_failed": True}
+
+    def fetch_custom_search(self, query: str, google_api_key: str, search_engine_id: str) -> Dict[str, Any]:
+        """Fetch one query's Custom Search JSON (no UI calls, so it can run in a worker thread)"""
+        key_hash = hashlib.sha1(google_api_key.encode("utf-8")).hexdigest()
+        return _fetch_custom_search_json(self.http_session, key_hash, search_engine_id, query, google_api_key)
+
+    def collect_search_items(self, search_queries: List[str], google_api_key: str, search_engine_id: str, location: str = None) -> tuple:
+        """Run the Custom Search queries concurrently; return (item, response data) pairs and the number of failed queries"""
+        raw_items = []
+        failed_queries = 0
+        if not search_queries:
+            return raw_items, failed_queries
+
+        with ThreadPoolExecutor(max_workers=min(8, len(search_queries))) as executor:
+            futures = [
+                executor.submit(self.fetch_custom_search, query, google_api_key, search_engine_id)
+                for query in search_queries
+            ]
+
+        # Report per query on the script thread, in query order
+        for query, future in zip(search_queries, futures):
+            try:
+                if location:
                     st.info(f"🔍 Searching Google Custom Search in {location} for '{query}'...")
+                else:
+                    st.info(f"🔍 Searching Google Custom Search for '{query}'...")
+
+                try:
+                    data = future.result()
+                except requests.HTTPError as e:
+                    st.warning(f"API Error: {e}")
+                    failed_queries += 1
+                    continue
+
+                st.write(f"API Response Items: {len(data.get('items', []))}")  # Debug
 
-                    response = requests.get(url, params=params, timeout=15)
-                    st.write(f"API Response Status: {response.status_code}")  # Debug
-                    if response.status_code != 200:
-                        st.warning(f"API Error: {response.text}")
-                        continue
-
-                    data = response.json()
-                    st.write(f"API Response Items: {len(data.get('items', []))}")  # Debug
-
-                    items_key = "items"
-                    if items_key not in data or not data[items_key]:
-                        st.warning(f"No results found for query: {query}")
-                        continue
-
-                    for item in data[items_key]:
-                        job_data = {
-                            "title": item.get("title", "Unknown Title") or "Unknown Title",
-                            "company": item.get("pagemap", {}).get("metatags", [{}])[0].get("og:site_name", "Unknown Company") or "Unknown Company",
-                            "location": location,
-                            "description": item.get("snippet", "No description") or "No description",
-                            "apply_link": self.get_best_apply_link(item, response_data=data),
-                            "salary": "Not specified",
-                            "source": "Google Custom Search",
-                            "match_score": self.calculate_match_score(skills, item.get("snippet", "")),
-                            "required_skills": self.extract_skills_from_description(item.get("snippet", ""))
-                        }
-
-                        title_lower = (job_data["title"] or "").lower()
-                        if any(word in title_lower for word in ["intern", "internship", "trainee"]):
-                            all_internships.append(job_data)
-                        else:
-                            all_jobs.append(job_data)
-
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    st.warning(f"⚠️ Error searching Google Custom Search: {str(e)}")
+                items_key = "items"
+                if items_key not in data or not data[items_key]:
+                    st.warning(f"No results found for query: {query}")
                     continue
 
-            unique_jobs = self.remove_duplicates(all_jobs)
-            unique_internships = self.remove_duplicates(all_internships)
+                raw_items.extend((item, data) for item in data[items_key])
 
-            unique_jobs.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-            unique_internships.sort(key=lambda x: x.get("match_score", 0), reverse=True)
+            except Exception as e:
+                st.warning(f"⚠️ Error searching Google Custom Search: {str(e)}")
+                failed_queries += 1
+                continue
 
-            st.success(f"✅ Found {len(unique_jobs)} jobs and {len(unique_internships)} internships in {location}")
+        return raw_items, failed_queries
 
-            return {
-                "jobs": unique_jobs[:20],
-                "internships": unique_internships[:10],
-                "search_queries": search_queries[:8]
+    def rank_search_items(self, raw_items: List[tuple], skills: List[str], location: str = None,
+                          max_jobs: int = 20, max_internships: int = 10) -> Dict[str, Any]:
+        """De-duplicate raw Custom Search items, build job records, then split them and keep the best matches"""
+        all_jobs = []
+        all_internships = []
+        seen = set()
+        prepared_skills = self.prepare_skills(skills)  # shared by every item's match score
+
+        for item, data in raw_items:
+            metatags = (item.get("pagemap", {}).get("metatags") or [{}])[0]
+            title = item.get("title", "Unknown Title") or "Unknown Title"
+            company = metatags.get("og:site_name", "Unknown Company") or "Unknown Company"
+            apply_link = self.get_best_apply_link(item, response_data=data)
+
+            # Drop repeats (the same posting from several queries) before scoring them
+            key = _normalize_link(apply_link) if apply_link else (title.lower(), company.lower())
+            if key in seen:
+                continue
+            seen.add(key)
+
+            snippet = item.get("snippet", "") or ""
+            prepared_snippet = self.prepare_description(snippet)  # lowercased and tokenized once for both matchers
+            job_data = {
+                "title": title,
+                "company": company,
+                "location": location or metatags.get("og:locality", "Unknown Location") or "Unknown Location",
+                "description": snippet or "No description",
+                "apply_link": apply_link,
+                "salary": "Not specified",
+                "source": "Google Custom Search",
+                "match_score": self.calculate_match_score(skills, snippet, prepared_desc=prepared_snippet, prepared=prepared_skills)
             }
 
-        except Exception as e:
-            st.error(f"❌ Error with location-based job search: {e}")
-            return {"jobs": [], "internships": [], "search_queries": []}
+            if _INTERNSHIP_TITLE_RX.search(title):
+                all_internships.append((job_data, prepared_snippet))
+            else:
+                all_jobs.append((job_data, prepared_snippet))
+
+        top_jobs = heapq.nlargest(max_jobs, all_jobs, key=lambda pair: pair[0].get("match_score", 0))
+        top_internships = heapq.nlargest(max_internships, all_internships, key=lambda pair: pair[0].get("match_score", 0))
+
+        # Display-only fields are filled in for the kept results alone
+        for top, search_suffix in ((top_jobs, "jobs"), (top_internships, "internship")):
+            for job_data, prepared_snippet in top:
+                apply_link = (job_data["apply_link"] or "").strip()
+                if not apply_link or apply_link == "#":
+                    apply_link = _google_search_url(job_data["company"], job_data["title"], search_suffix)
+                job_data["display_apply_link"] = apply_link
+                job_data["short_description"] = textwrap.shorten(job_data["description"], width=200, placeholder="...")
+                job_data["required_skills"] = self.extract_skills_from_description(job_data["description"], prepared_desc=prepared_snippet)
+                job_data["required_skills_text"] = ", ".join(job_data["required_skills"])
+                job_data["match_label"] = f"{job_data['title']} at {job_data['company']} - {job_data['match_score']}% Match"
+
+        return {
+            "jobs": [job_data for job_data, _ in top_jobs],
+            "internships": [job_data for job_data, _ in top_internships],
+            "job_count": len(all_jobs),
+            "internship_count": len(all_internships)
+        }
+
+    def prepare_skills(self, user_skills: List[str]) -> tuple:
+        """Lowercase and classify the user's skills once per search: (single-token skill set, phrases, total)"""
+        token_skills = set()
+        phrase_skills = []
+        for skill in user_skills or []:
+            if not skill:
+                continue
+            skill_lower = skill.lower().strip()
+            if _TOKEN_RX.fullmatch(skill_lower):
+                token_skills.add(skill_lower.strip("."))
+            else:
+                phrase_skills.append(skill_lower)
+        return frozenset(token_skills), phrase_skills, len(user_skills or [])
 
-    def calculate_match_score(self, user_skills: List[str], job_description: str) -> int:
+    def prepare_description(self, description: str) -> tuple:
+        """Lowercase and tokenize a description once for both matchers: (lowercased text, token set)"""
+        desc_lower = (description or "").lower()
+        return desc_lower, _tokenize(desc_lower)
+
+    def calculate_match_score(self, user_skills: List[str], job_description: str, prepared_desc: tuple = None, prepared: tuple = None) -> int:
         """Calculate match percentage between user skills and job requirements"""
         if not user_skills or not job_description:
             return 0
 
-        job_desc_lower = (job_description or "").lower()
-        matched_skills = 0
+        job_desc_lower, tokens = prepared_desc or self.prepare_description(job_description)
+        token_skills, phrase_skills, total = prepared or self.prepare_skills(user_skills)
 
-        for skill in user_skills:
-            if skill and skill.lower() in job_desc_lower:
-                matched_skills += 1
+        matched_skills = len(tokens & token_skills)
+        matched_skills += sum(skill in job_desc_lower for skill in phrase_skills)
 
-        try:
-            return int((matched_skills / len(user_skills)) * 100) if user_skills else 0
-        except Exception:
-            return 0
+        return int((matched_skills / total) * 100) if total else 0
 
-    def extract_skills_from_description(self, description: str) -> List[str]:
+    def extract_skills_from_description(self, description: str, prepared_desc: tuple = None) -> List[str]:
         """Extract skills from job description"""
         if not description:
             return []
 
-        tech_skills = [
-            "python", "java", "javascript", "typescript", "c++", "c#", "php", "ruby", "go", "rust", "swift", "kotlin",
-            "react", "angular", "vue.js", "node.js", "express", "django", "flask", "fastapi", "spring boot",
-            "html", "css", "sass", "bootstrap", "tailwind", "jquery",
-            "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch", "oracle", "sqlite",
-            "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "git", "github", "gitlab",
-            "terraform", "ansible", "linux", "bash",
-            "machine learning", "ai", "data analysis", "pandas", "numpy", "tensorflow", "pytorch",
-            "tableau", "power bi", "excel", "r", "spark",
-            "communication", "leadership", "project management", "agile", "scrum", "problem solving",
-            "teamwork", "time management"
-        ]
+        desc_lower, tokens = prepared_desc or self.prepare_description(description)
+        found_skills = tokens & _SINGLE_WORD_SKILLS
+        found_skills.update(_MULTI_WORD_SKILLS_RX.findall(desc_lower))
 
-        found_skills = []
-        desc_lower = description.lower()
+        return [skill.title() for skill in found_skills][:10]
 
-        for skill in tech_skills:
-            if skill in desc_lower:
-                found_skills.append(skill.title())
+# ============================================================================
+# STREAMLIT UI COMPONENTS
+# ============================================================================
 
-        return list(set(found_skills))[:10]
+# Summary table columns shared by the job and internship listings; the apply
+# column shows the link's domain so direct and Google-search links stand apart
+RESULTS_COLUMN_CONFIG = {
+    "Match": st.column_config.ProgressColumn("Match", format="%d%%", min_value=0, max_value=100),
+    "Apply": st.column_config.LinkColumn("Apply", display_text=r"https?://(?:www\.)?([^/]+)")
+}
 
-    def remove_duplicates(self, jobs: List[Dict]) -> List[Dict]:
-        """Remove duplicate jobs based on apply_link, title, and company"""
-        seen = set()
-        unique_jobs = []
+# Resume analysis prompt; {text} is replaced with the extracted resume text
+_EXTRACT_PROMPT_TMPL = """
+Based on the following resume content, extract relevant information:
 
-        for job in jobs:
-            apply_link = (job.get("apply_link") or "").lower()
-            title = (job.get("title") or "").lower()
-            company = (job.get("company") or "").lower()
-            key = (apply_link, title, company) if apply_link else (title, company)
-            if key not in seen:
-                seen.add(key)
-                unique_jobs.append(job)
+RESUME CONTENT:
+{text}
 
-        return unique_jobs
+Extract:
+1. Technical skills (programming languages, frameworks, tools)
+2. Soft skills
+3. Job preferences or career interests
+4. Experience level
 
-# ============================================================================
-# STREAMLIT UI COMPONENTS
-# ============================================================================
+Respond with JSON containing "skills" (list of skills), "job_interests"
+(list of job titles/fields) and "experience_level" (entry/mid/senior).
+"""
 
-# def main():
-#     """Main application function"""
-#     # Add background image CSS
-#     background_css = """
-#     <style>
-#     .stApp {
+# Fingerprint of everything besides the resume that shapes an analysis; part of
+# the cache key so prompt, schema or model changes don't serve old entries
+_ANALYSIS_FINGERPRINT = hashlib.sha1(
+    "\n".join([_EXTRACT_PROMPT_TMPL, json.dumps(RESUME_ANALYSIS_SCHEMA, sort_keys=True), GEMINI_MODEL]).encode("utf-8")
+).digest()
 
-#         background-image: url("https://getwallpapers.com/wallpaper/full/c/1/1/872506-new-white-wallpaper-background-1920x1200-for-samsung.jpg");  /* Replace with your image URL */
-#         background-size: cover;
-#         background-position: center;
-#         background-attachment: fixed;
-#         background-repeat: no-repeat;
-#     }
-#     /* Improve text readability */
-#     .stApp * {
-#         color: #000000;  /* black text for contrast */
-#         text-shadow: 1px 1px 2px rgba(0, 0, 0, 0);  /* Text shadow for readability */
-#     }
-#     /* Ensure sidebar text is readable */
-#     .stSidebar * {
-#         color: #000000;
-#         text-shadow: 1px 1px 2px rgba(0, 0, 0, 0);
-#     }
-#     /* Optional: Style buttons for better visibility */
-#     .stButton>button {
-#         background-color: #FFFFFF;
-#         color: white;
-#         border-radius: 5px;
-#         border: none;
-#     }
-#     .stButton>button:hover {
-#         background-color: #FFFFFF;
-#     }
-#     </style>
-#     """
-#     st.markdown(background_css, unsafe_allow_html=True)
-def main():
-    """Main application function"""
-    # Add background image CSS for light theme
-    background_css = """
+# One match per non-empty entry of comma-separated form input, surrounding whitespace excluded
+_COMMA_ITEM_RX = re.compile(r"[^,\s](?:[^,]*[^,\s])?")
+
+# Page title block, emitted as a single markdown element
+_PAGE_HEADER_MD = """
+# 💼 Smart Job Recommender
+### AI-Powered Job Matching with Real-Time Search
+---
+"""
+
+# Static sidebar help text; each block carries its own divider and heading
+_SIDEBAR_INSTRUCTIONS = """
+---
+### 📋 Instructions
+**Setup Required:**
+1. Add GEMINI_API_KEY to Streamlit secrets
+2. Add GOOGLE_API_KEY and SEARCH_ENGINE_ID to Streamlit secrets
+
+**How to Use:**
+1. Upload your resume PDF, OR
+2. Enter your skills manually
+3. Get personalized job recommendations
+4. Open the Apply link to apply directly
+"""
+
+_SIDEBAR_FEATURES = """
+---
+### 🎯 Features
+- Resume PDF analysis
+- Manual skill entry
+- Real-time job search via Google Custom Search
+- Real-time matching scores
+- Clickable application links
+- Location-based search
+"""
+
+# Likely causes listed when a search returns nothing
+_NO_RESULTS_HELP_MD = """
+- API configuration issues (check GOOGLE_API_KEY and SEARCH_ENGINE_ID)
+- Limited results from job sites (try broader queries or more skills)
+- CSE not configured to search the entire web
+- Quota limits reached (check Google Cloud Console)
+"""
+
+# Search input box styling
+_INPUT_CSS = """
+    <style>
+    /* Text Input & Text Area */
+    [data-testid="stTextInput"] input,
+    [data-testid="stTextArea"] textarea {
+        background-color: #d3d3d3 !important;
+        color: black !important;
+    }
+    [data-testid="stTextInput"] input::placeholder,
+    [data-testid="stTextArea"] textarea::placeholder {
+        color: #000000 !important;
+    }
+
+    /* Select Dropdown (Experience Level) */
+    [data-testid="stSelectbox"] div[data-baseweb="select"] {
+        background-color: #d3d3d3 !important;
+        color: black !important;
+    }
+    [data-testid="stSelectbox"] div[data-baseweb="select"] * {
+        color: black !important;
+    }
+
+    /* Browse files button */
+    [data-testid="stFileUploaderBrowseButton"] {
+        background-color: #FFFFFF !important;
+        color: #000000 !important;
+        border: 1px solid #CCCCCC !important;
+        border-radius: 5px !important;
+        padding: 4px 12px !important;
+    }
+    [data-testid="stFileUploaderBrowseButton"]:hover {
+        background-color: #F0F0F0 !important;
+        color: #000000 !important;
+    }
+
+    /* File uploader text inside drop area */
+    [data-testid="stFileUploader"] section div {
+        color: #000000 !important; /* black text */
+    }
+    </style>
+    """
+
+# Background image CSS for light theme
+_BACKGROUND_CSS = """
     <style>
     /* Set background for entire app including top and browser file areas */
     body, .stApp, .css-1aumxhk, .st-emotion-cache-1aumxhk {
@@ -623,112 +864,128 @@ def main():
     </style>
     """
 
-    # Search input box styling
-    st.markdown("""
-    <style>
-    /* Text Input & Text Area */
-    [data-testid="stTextInput"] input,
-    [data-testid="stTextArea"] textarea {
-        background-color: #d3d3d3 !important;
-        color: black !important;
-    }
-    [data-testid="stTextInput"] input::placeholder,
-    [data-testid="stTextArea"] textarea::placeholder {
-        color: #000000 !important;
-    }
-
-    /* Select Dropdown (Experience Level) */
-    [data-testid="stSelectbox"] div[data-baseweb="select"] {
-        background-color: #d3d3d3 !important;
-        color: black !important;
-    }
-    [data-testid="stSelectbox"] div[data-baseweb="select"] * {
-        color: black !important;
-    }
+# def main():
+#     """Main application function"""
+#     # Add background image CSS
+#     background_css = """
+#     <style>
+#     .stApp {
 
-    /* Browse files button */
-    [data-testid="stFileUploaderBrowseButton"] {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #CCCCCC !important;
-        border-radius: 5px !important;
-        padding: 4px 12px !important;
-    }
-    [data-testid="stFileUploaderBrowseButton"]:hover {
-        background-color: #F0F0F0 !important;
-        color: #000000 !important;
-    }
+#         background-image: url("https://getwallpapers.com/wallpaper/full/c/1/1/872506-new-white-wallpaper-background-1920x1200-for-samsung.jpg");  /* Replace with your image URL */
+#         background-size: cover;
+#         background-position: center;
+#         background-attachment: fixed;
+#         background-repeat: no-repeat;
+#     }
+#     /* Improve text readability */
+#     .stApp * {
+#         color: #000000;  /* black text for contrast */
+#         text-shadow: 1px 1px 2px rgba(0, 0, 0, 0);  /* Text shadow for readability */
+#     }
+#     /* Ensure sidebar text is readable */
+#     .stSidebar * {
+#         color: #000000;
+#         text-shadow: 1px 1px 2px rgba(0, 0, 0, 0);
+#     }
+#     /* Optional: Style buttons for better visibility */
+#     .stButton>button {
+#         background-color: #FFFFFF;
+#         color: white;
+#         border-radius: 5px;
+#         border: none;
+#     }
+#     .stButton>button:hover {
+#         background-color: #FFFFFF;
+#     }
+#     </style>
+#     """
+#     st.markdown(background_css, unsafe_allow_html=True)
 
-    /* File uploader text inside drop area */
-    [data-testid="stFileUploader"] section div {
-        color: #000000 !important; /* black text */
+def _get_api_status() -> Dict[str, bool]:
+    """Check which API credentials are configured (cheap: reuses the cached credential lookup)"""
+    api_keys = _get_api_keys()
+    return {
+        "gemini": bool(api_keys["GEMINI_API_KEY"]),
+        "google": bool(api_keys["GOOGLE_API_KEY"]),
+        "search_engine": bool(api_keys["SEARCH_ENGINE_ID"])
     }
-    </style>
-    """, unsafe_allow_html=True)
-
-    st.markdown(background_css, unsafe_allow_html=True)
-
-
-
-
-
 
+@st.cache_resource(show_spinner=False)
+def get_rag_system() -> SmartJobRecommenderRAG:
+    """Shared recommender instance, built once per process"""
+    return SmartJobRecommenderRAG()
+
+# Bounded like the analysis cache: the text is personal data shared process-wide
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _load_resume_text(_rag_system: SmartJobRecommenderRAG, pdf_digest: str, _pdf_bytes: bytes) -> str:
+    """Extract resume text from a PDF, cached on a BLAKE2b digest of the file contents"""
+    return _rag_system.load_document_with_pypdf(io.BytesIO(_pdf_bytes))
+
+# Kept in memory only: Streamlit's disk persistence never deletes entries, and these
+# hold resume-derived personal data, so they expire after an hour and are capped
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _analyze_resume_text(_rag_system: SmartJobRecommenderRAG, text_hash: str, _resume_text: str) -> Dict[str, Any]:
+    """Extract skills, interests and level from resume text with Gemini, cached on a SHA-1 of the text and analysis fingerprint"""
+    final_prompt = _EXTRACT_PROMPT_TMPL.format(text=_resume_text)
+    extracted_data = _rag_system.call_direct_gemini(final_prompt)
+    if not extracted_data["skills"] and not extracted_data["job_interests"]:
+        # Raising keeps failed or empty analyses out of the cache
+        raise ValueError("Gemini returned no skills or job interests")
+    return extracted_data
+
+def _search_key(values: List[str]) -> tuple:
+    """Canonical search terms: lowercased, whitespace-collapsed, de-duplicated, order kept"""
+    return tuple(dict.fromkeys(" ".join(value.lower().split()) for value in values if value.strip()))
+
+class _UncacheableSearch(Exception):
+    """Raised out of _search_jobs_cached so Streamlit doesn't cache a search with failed queries"""
+
+    def __init__(self, job_results: Dict[str, List]):
+        super().__init__("Job search had failed queries")
+        self.job_results = job_results
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _search_jobs_cached(_rag_system: SmartJobRecommenderRAG, skills: tuple, job_interests: tuple, location: str = "") -> Dict[str, List]:
+    """Run a Custom Search job search, cached on the skills, interests and location"""
+    if location:
+        job_results = _rag_system.search_jobs_with_custom_search_api_location(list(skills), list(job_interests), location)
+    else:
+        job_results = _rag_system.search_jobs_with_custom_search_api(list(skills), list(job_interests))
+    if job_results.pop("search_failed", False):
+        # Raising keeps searches with any failure (missing keys, API errors, exceptions)
+        # out of the cache; the caller still shows whatever results they did get
+        raise _UncacheableSearch(job_results)
+    return job_results
 
+def main():
+    """Main application function"""
+    st.html(_INPUT_CSS)
+    st.html(_BACKGROUND_CSS)
 
-    if "rag_system" not in st.session_state:
-        st.session_state.rag_system = SmartJobRecommenderRAG()
+    rag_system = get_rag_system()
 
-    st.title("💼 Smart Job Recommender")
-    st.markdown("### AI-Powered Job Matching with Real-Time Search")
-    st.markdown("---")
+    st.markdown(_PAGE_HEADER_MD)
 
     with st.sidebar:
         st.header("🔧 Configuration")
         st.subheader("API Status")
 
-        try:
-            gemini_key = st.secrets.get("GEMINI_API_KEY") or os.environ.get("GEMINI_API_KEY")
-            if gemini_key:
-                st.success("✅ Gemini AI: Connected")
-            else:
-                st.error("❌ Gemini AI: API key required")
-        except Exception:
+        api_status = _get_api_status()
+
+        if api_status["gemini"]:
+            st.success("✅ Gemini AI: Connected")
+        else:
             st.error("❌ Gemini AI: API key required")
 
-        try:
-            google_api_key = st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-            search_engine_id = st.secrets.get("SEARCH_ENGINE_ID") or os.environ.get("SEARCH_ENGINE_ID")
-            if google_api_key and search_engine_id:
-                st.success("✅ Google Custom Search: Connected")
-            else:
-                st.error("❌ Google Custom Search: API key and Search Engine ID required")
-        except Exception:
+        if api_status["google"] and api_status["search_engine"]:
+            st.success("✅ Google Custom Search: Connected")
+        else:
             st.error("❌ Google Custom Search: API key and Search Engine ID required")
 
-        st.markdown("---")
-        st.subheader("📋 Instructions")
-        st.markdown("""
-        **Setup Required:**
-        1. Add GEMINI_API_KEY to Streamlit secrets
-        2. Add GOOGLE_API_KEY and SEARCH_ENGINE_ID to Streamlit secrets
-
-        **How to Use:**
-        1. Upload your resume PDF, OR
-        2. Enter your skills manually
-        3. Get personalized job recommendations
-        4. Click 'Apply Now' to apply directly
-        """)
+        st.checkbox("Show debug output", key="debug", help="Show the extracted or entered profile data")
 
-        st.markdown("---")
-        st.subheader("🎯 Features")
-        st.markdown("""
-        - Resume PDF analysis
-        - Manual skill entry
-        - Real-time job search via Google Custom Search
-        - Real-time matching scores
-        - Clickable application links
-        - Location-based search
-        """)
+        st.markdown(_SIDEBAR_INSTRUCTIONS)
+        st.markdown(_SIDEBAR_FEATURES)
 
     tab1, tab2 = st.tabs(["📄 Resume Upload", "✍️ Manual Entry"])
 
@@ -736,17 +993,24 @@ def main():
         st.header("📄 Upload Your Resume")
         st.markdown("Upload your resume in PDF format for AI-powered skill extraction and job matching.")
 
-        uploaded_file = st.file_uploader(
-            "Choose your resume PDF file",
-            type="pdf",
-            help="Upload a clear, text-readable PDF resume for best results."
-        )
+        with st.form("resume_form", clear_on_submit=False):
+            uploaded_file = st.file_uploader(
+                "Choose your resume PDF file",
+                type="pdf",
+                help="Upload a clear, text-readable PDF resume for best results."
+            )
 
-        if uploaded_file is not None:
-            st.success(f"✅ Uploaded: {uploaded_file.name}")
+            submitted = st.form_submit_button("🚀 Analyze Resume & Find Jobs", type="primary")
 
-            if st.button("🚀 Analyze Resume & Find Jobs", type="primary"):
-                process_resume_and_find_jobs(uploaded_file)
+        if submitted:
+            if uploaded_file is not None:
+                st.success(f"✅ Uploaded: {uploaded_file.name}")
+                process_resume_and_find_jobs(rag_system, uploaded_file)
+            else:
+                st.error("Please upload your resume PDF first.")
+        elif "resume_results" in st.session_state:
+            # Re-show the last analysis on unrelated reruns instead of dropping it
+            display_results(*st.session_state["resume_results"])
 
     with tab2:
         st.header("✍️ Manual Skills Entry")
@@ -786,8 +1050,8 @@ def main():
 
             if submitted:
                 if skills_input.strip():
-                    skills_list = [skill.strip() for skill in skills_input.split(',') if skill.strip()]
-                    interests_list = [interest.strip() for interest in job_interests.split(',') if interest.strip()]
+                    skills_list = _COMMA_ITEM_RX.findall(skills_input)
+                    interests_list = _COMMA_ITEM_RX.findall(job_interests)
 
                     manual_data = {
                         "skills": skills_list,
@@ -795,115 +1059,118 @@ def main():
                         "experience_level": experience_level
                     }
 
-                    process_manual_skills_and_find_jobs(manual_data, location_pref)
+                    process_manual_skills_and_find_jobs(rag_system, manual_data, location_pref)
                 else:
                     st.error("Please enter at least some skills to find matching jobs.")
+            elif "manual_results" in st.session_state:
+                display_results(*st.session_state["manual_results"])
 
-def process_resume_and_find_jobs(uploaded_file):
+def process_resume_and_find_jobs(rag_system: SmartJobRecommenderRAG, uploaded_file):
     """Process uploaded resume and find matching jobs"""
-    rag_system = st.session_state.rag_system
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-
-    try:
-        status_text.text("📄 Loading PDF document...")
-        progress_bar.progress(20)
-        documents = rag_system.load_document_with_pypdf(uploaded_file)
-
-        if not documents:
-            st.error("❌ Failed to load PDF. Please check the file format.")
-            return
-
-        status_text.text("📝 Analyzing resume content...")
-        progress_bar.progress(50)
-
-        all_text = "\n\n".join([doc.page_content for doc in documents])
-
-        final_prompt = f"""
-Based on the following resume content, extract relevant information:
-
-RESUME CONTENT:
-{all_text}
+    st.session_state.pop("resume_results", None)
 
-Extract:
-1. Technical skills (programming languages, frameworks, tools)
-2. Soft skills
-3. Job preferences or career interests
-4. Experience level
-
-Format your response as:
-SKILLS: [comma-separated list of skills]
-JOB_INTERESTS: [comma-separated job titles/fields]
-EXPERIENCE_LEVEL: [entry/mid/senior]
-"""
-
-        status_text.text("🤖 Analyzing with Gemini AI...")
-        progress_bar.progress(80)
-        extracted_data = rag_system.call_direct_gemini(final_prompt)
-        st.write(f"Extracted Data: {extracted_data}")  # Debug
+    with st.status("📄 Loading PDF document...", expanded=False) as status:
+        try:
+            pdf_bytes = uploaded_file.getvalue()
+            pdf_digest = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+            all_text = _load_resume_text(rag_system, pdf_digest, pdf_bytes)
 
-        status_text.text("🔍 Searching for matching jobs...")
-        progress_bar.progress(90)
-        job_results = rag_system.search_jobs_with_custom_search_api(
-            extracted_data["skills"],
-            extracted_data["job_interests"]
-        )
+            if not all_text:
+                st.error("❌ Failed to load PDF. Please check the file format.")
+                status.update(label="❌ Failed to load PDF", state="error", expanded=True)
+                return
 
-        progress_bar.progress(100)
-        status_text.text("✅ Analysis complete!")
-        time.sleep(1)
+            status.update(label="🤖 Analyzing with Gemini AI...")
+            try:
+                text_hash = hashlib.sha1(_ANALYSIS_FINGERPRINT + all_text.encode("utf-8")).hexdigest()
+                extracted_data = _analyze_resume_text(rag_system, text_hash, all_text)
+            except ValueError:
+                extracted_data = {"skills": [], "job_interests": [], "experience_level": "entry"}
+            if st.session_state.get("debug"):
+                st.json(extracted_data)
+
+            status.update(label="🔍 Searching for matching jobs...")
+            try:
+                job_results = _search_jobs_cached(
+                    rag_system,
+                    _search_key(extracted_data["skills"]),
+                    _search_key(extracted_data["job_interests"])
+                )
+            except _UncacheableSearch as e:
+                job_results = e.job_results
 
-        progress_bar.empty()
-        status_text.empty()
+            status.update(label="✅ Analysis complete!", state="complete")
 
-        display_results(extracted_data, job_results)
+        except Exception as e:
+            st.error(f"❌ Error during processing: {e}")
+            status.update(label="❌ Error during processing", state="error", expanded=True)
+            return
 
-    except Exception as e:
-        st.error(f"❌ Error during processing: {e}")
-        progress_bar.empty()
-        status_text.empty()
+    st.session_state["resume_results"] = (extracted_data, job_results)
+    display_results(extracted_data, job_results)
 
-def process_manual_skills_and_find_jobs(manual_data: Dict[str, Any], location_pref: str):
+def process_manual_skills_and_find_jobs(rag_system: SmartJobRecommenderRAG, manual_data: Dict[str, Any], location_pref: str):
     """Process manually entered skills and find matching jobs"""
-    rag_system = st.session_state.rag_system
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-
-    try:
-        status_text.text("📝 Processing your skills...")
-        progress_bar.progress(20)
+    st.session_state.pop("manual_results", None)
 
-        st.success(f"✅ Skills processed: {len(manual_data['skills'])} skills found")
-        st.write(f"Manual Input Data: {manual_data}")  # Debug
-
-        status_text.text("🔍 Searching for matching jobs...")
-        progress_bar.progress(60)
-
-        if location_pref.strip():
-            job_results = rag_system.search_jobs_with_custom_search_api_location(
-                manual_data["skills"],
-                manual_data["job_interests"],
-                location_pref
-            )
-        else:
-            job_results = rag_system.search_jobs_with_custom_search_api(
-                manual_data["skills"],
-                manual_data["job_interests"]
-            )
+    with st.status("📝 Processing your skills...", expanded=False) as status:
+        try:
+            st.success(f"✅ Skills processed: {len(manual_data['skills'])} skills found")
+            if st.session_state.get("debug"):
+                st.json(manual_data)
 
-        progress_bar.progress(100)
-        status_text.text("✅ Search complete!")
-        time.sleep(1)
+            status.update(label="🔍 Searching for matching jobs...")
+            try:
+                job_results = _search_jobs_cached(
+                    rag_system,
+                    _search_key(manual_data["skills"]),
+                    _search_key(manual_data["job_interests"]),
+                    " ".join(location_pref.split())
+                )
+            except _UncacheableSearch as e:
+                job_results = e.job_results
 
-        progress_bar.empty()
-        status_text.empty()
+            status.update(label="✅ Search complete!", state="complete")
 
-        display_results(manual_data, job_results)
+        except Exception as e:
+            st.error(f"❌ Error during job search: {e}")
+            status.update(label="❌ Error during job search", state="error", expanded=True)
+            return
 
-    except Exception as e:
-        st.error(f"❌ Error during job search: {e}")
-        progress_bar.empty()
-        status_text.empty()
+    st.session_state["manual_results"] = (manual_data, job_results)
+    display_results(manual_data, job_results)
+
+def _render_listings(listings: List[Dict[str, Any]], details_label: str, show_salary: bool = False):
+    """Render job or internship records as a summary table plus one details expander"""
+    table = []
+    details = []
+    for i, listing in enumerate(listings, 1):
+        row = {
+            "#": i,
+            "Title": listing['title'],
+            "Company": listing['company'],
+            "Location": listing.get('location', '')
+        }
+        if show_salary:
+            row["Salary"] = listing.get('salary', 'Not specified')
+        row["Match"] = listing.get('match_score', 0)
+        row["Apply"] = listing['display_apply_link']
+        table.append(row)
+
+        details.append(f"#### #{i} {listing['match_label']}")
+        details.append(f"**Description:** {listing.get('short_description', '')}")
+        if listing.get('required_skills_text'):
+            details.append(f"**Required Skills:** {listing['required_skills_text']}")
+
+    st.dataframe(
+        table,
+        column_config=RESULTS_COLUMN_CONFIG,
+        hide_index=True,
+        width="stretch"
+    )
+
+    with st.expander(details_label):
+        st.markdown("\n\n".join(details))
 
 def display_results(extracted_data: Dict[str, Any], job_results: Dict[str, List]):
     """Display analysis results and job recommendations"""
@@ -915,16 +1182,14 @@ def display_results(extracted_data: Dict[str, Any], job_results: Dict[str, List]
     with col1:
         st.subheader("🛠️ Skills Found")
         if extracted_data["skills"]:
-            for skill in extracted_data["skills"]:
-                st.markdown(f"• {skill}")
+            st.markdown("\n".join(f"- {skill}" for skill in extracted_data["skills"]))
         else:
             st.info("No specific skills detected")
 
     with col2:
         st.subheader("💼 Job Interests")
         if extracted_data["job_interests"]:
-            for interest in extracted_data["job_interests"]:
-                st.markdown(f"• {interest}")
+            st.markdown("\n".join(f"- {interest}" for interest in extracted_data["job_interests"]))
         else:
             st.info("No specific interests detected")
 
@@ -941,104 +1206,16 @@ def display_results(extracted_data: Dict[str, Any], job_results: Dict[str, List]
 
     if jobs:
         st.subheader(f"🎯 Found {len(jobs)} Job Matches")
-
-        for i, job in enumerate(jobs, 1):
-            with st.expander(f"#{i} {job['title']} at {job['company']} - {job.get('match_score', 0)}% Match"):
-                col1, col2 = st.columns([2, 1])
-
-                with col1:
-                    st.write(f"**Company:** {job['company']}")
-                    st.write(f"**Location:** {job['location']}")
-                    st.write(f"**Salary:** {job.get('salary', 'Not specified')}")
-                    st.write(f"**Description:** {job.get('description','')[:200]}...")
-
-                    if job.get('required_skills'):
-                        st.write("**Required Skills:**")
-                        for skill in job.get('required_skills', []):
-                            st.markdown(f"• {skill}")
-
-                with col2:
-                    st.metric("Match Score", f"{job.get('match_score',0)}%")
-                    st.write(f"**Source:** {job.get('source', 'Unknown')}")
-
-                    apply_link_local = (job.get('apply_link') or '').strip()
-                    if apply_link_local and apply_link_local != "#":
-                        st.link_button("🚀 Apply Now", apply_link_local, type="primary")
-                        st.caption("Click to apply on the job site")
-                    else:
-                        st.warning("No direct apply link available")
-                        if job.get('company') and job.get('title'):
-                            q = quote_plus(f"{job.get('company')} {job.get('title')} jobs")
-                            search_url = f"https://www.google.com/search?q={q}"
-                            st.link_button("🔍 Search on Google", search_url)
+        _render_listings(jobs, "📋 Job details", show_salary=True)
 
     if internships:
         st.markdown("---")
         st.subheader(f"🎓 Found {len(internships)} Internship Matches")
-
-        for i, internship in enumerate(internships, 1):
-            with st.expander(f"#{i} {internship['title']} at {internship['company']} - {internship.get('match_score',0)}% Match"):
-                col1, col2 = st.columns([2, 1])
-
-                with col1:
-                    st.write(f"**Company:** {internship['company']}")
-                    st.write(f"**Location:** {internship.get('location','')}")
-                    st.write(f"**Description:** {internship.get('description','')[:200]}...")
-
-                    if internship.get('required_skills'):
-                        st.write("**Required Skills:**")
-                        for skill in internship.get('required_skills', []):
-                            st.markdown(f"• {skill}")
-
-                with col2:
-                    st.metric("Match Score", f"{internship.get('match_score',0)}%")
-                    st.write(f"**Source:** {internship.get('source', 'Unknown')}")
-
-                    internship_apply = (internship.get('apply_link') or '').strip()
-                    if internship_apply and internship_apply != "#":
-                        st.link_button("🚀 Apply Now", internship_apply, type="primary")
-                        st.caption("Click to apply on the internship site")
-                    else:
-                        st.warning("No direct apply link available")
-                        if internship.get('company') and internship.get('title'):
-                            q = quote_plus(f"{internship.get('company')} {internship.get('title')} internship")
-                            search_url = f"https://www.google.com/search?q={q}"
-                            st.link_button("🔍 Search on Google", search_url)
+        _render_listings(internships, "📋 Internship details")
 
     if not jobs and not internships:
         st.info("🔍 No job matches found. This could be due to:")
-        st.markdown("""
-        - API configuration issues (check GOOGLE_API_KEY and SEARCH_ENGINE_ID)
-        - Limited results from job sites (try broader queries or more skills)
-        - CSE not configured to search the entire web
-        - Quota limits reached (check Google Cloud Console)
-        """)
-
-    ########
-    for i, job in enumerate(job_data):
-        with st.expander(f"{job['title']} at {job['company']}"):
-            st.write(f"**Location:** {job['location']}")
-            st.write(f"**Description:** {job['description']}")
-            st.write(f"**Match Score:** {job['match_score']:.2f}%")
-            st.write(f"**Link:** [{job['link']}]({job['link']})")
-            if st.button("🚀 Apply Now", key=f"apply_{i}"):
-                apply_data = {
-                    "company": job['company'],
-                    "job_title": job['title'],
-                    "location": job['location'],
-                    "job_description": job['description'],
-                    "user_skills": ','.join(extracted_data['skills']),
-                    "experience_level": extracted_data['experience_level']
-                }
-                import requests
-                n8n_webhook_url = "https://[your-subdomain].n8n.cloud/webhook/job-apply-webhook"  # Replace with your URL
-                response = requests.post(n8n_webhook_url, json=apply_data)
-                if response.status_code == 200:
-                    st.success("✅ Application logged and cover letter generated!")
-                else:
-                    st.error(f"❌ Error: {response.text}")
-
-
+        st.markdown(_NO_RESULTS_HELP_MD)
 
 # ============================================================================
 # RUN APPLICATION